@@ -5,16 +5,24 @@ Generates a JSON report from Playwright tests, security scans, server logs, and
 """
 
 import argparse
+import contextlib
 import json
 import logging
+import mmap
 import os
 import re
+import stat
 import sys
-import xml.etree.ElementTree as ET
-from collections import Counter
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache, partial
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None  # type: ignore[assignment]
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,11 +30,424 @@ logging.basicConfig(
 )
 logger = logging.getLogger("duo-troubleshoot")
 
+# Maximum number of server log error lines included in the results
+MAX_SERVER_LOG_ERRORS = 10
+
+# Security reports at least this many bytes are streamed when ijson is available
+STREAM_SECURITY_REPORT_SIZE = 1_000_000
+
+# Fields of each test_results["failure_details"] record (or column)
+FAILURE_DETAIL_FIELDS = ("test_name", "class_name", "message", "type", "content")
+
+# Testcase child elements and their index in the outcome counts
+_CASE_OUTCOMES = {"failure": 1, "error": 2, "skipped": 3}
+
+# Vulnerability fields read from streamed security reports
+_FINDING_FIELDS = frozenset(("severity",))
+_SCALAR_EVENTS = frozenset(("string", "number", "boolean", "null"))
+
+# Size of the slices used when scanning a mapped file
+_CHUNK_SIZE = 1 << 20
+
+# Lowercase markers of an error line in the server log (matched case-insensitively)
+_SERVER_ERR_MARKERS = (b"error:", b"exception:", b"failed to", b"fatal:", b"[error]")
+# Bytes shared between consecutive windows so no marker is split across them
+_SERVER_ERR_OVERLAP = max(map(len, _SERVER_ERR_MARKERS)) - 1
+
+# Warnings and recommendations added by more than one check (or by finalize),
+# shared as module constants
+WARN_COVERAGE_MISSING = "Coverage directory not found"
+REC_FIX_FAILING = "Fix failing tests before merging"
+REC_COVERAGE_CFG = "Configure code coverage collection in your tests"
+REC_MORE_COVERAGE = "Consider adding more test coverage"
+REC_SECURITY_SCANS = "Set up regular security scans"
+REC_AUTOMATED_TESTS = "Set up automated tests for your project"
+
+# lxml iterparse options: only testcase end events reach Python, and the parser
+# skips content the analysis never reads (entities, DTD lookups, comments,
+# blank text). huge_tree lifts libxml2's 10 MB text node limit, which trusted
+# CI output such as a long system-out can exceed
+_LXML_ITERPARSE_OPTIONS: Dict[str, Any] = {
+    "tag": "testcase",
+    "resolve_entities": False,
+    "no_network": True,
+    "huge_tree": True,
+    "collect_ids": False,
+    "remove_comments": True,
+    "remove_pis": True,
+    "remove_blank_text": True,
+}
+
+# Precompiled patterns for log analysis, one per CI log issue
+# (the vocabulary is ASCII, so Unicode case folding is not needed)
+_CI_LOG_PATTERNS = {
+    "timeout": re.compile(r"timeout.*?\d", re.IGNORECASE | re.ASCII),
+    "oom": re.compile(r"out of memory|memory limit exceeded", re.IGNORECASE | re.ASCII),
+    "duration": re.compile(r"Duration: (\d+\.\d+) seconds", re.ASCII),
+    "coverage": re.compile(
+        r"No coverage directory found|Coverage directory not found",
+        re.IGNORECASE | re.ASCII,
+    ),
+}
+# Cheap substring checks that must succeed for each CI log issue to match;
+# all but the case-sensitive duration are tested against the lowercased log
+_CI_LOG_ANCHORS = {
+    "timeout": "timeout",
+    "oom": "memory",
+    "coverage": "coverage directory",
+}
+_CI_DURATION_ANCHOR = "Duration: "
+# Shortest text any CI log issue can match ("timeout" followed by a digit)
+_CI_LOG_MIN_LENGTH = 8
+
+
+def _loads(content):
+    """Parse a JSON document, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dumps(obj, pretty: bool = False) -> bytes:
+    """Serialize an object to JSON bytes, compact unless pretty is set."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    # Write non-ASCII text as UTF-8, as orjson does
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@lru_cache(maxsize=None)
+def _xml_parser():
+    """Import the XML parser on first use, preferring lxml.
+
+    Returns the ElementTree-compatible module and the iterparse options for it.
+    """
+    try:
+        from lxml import etree
+    except ImportError:  # lxml is optional; fall back to the stdlib parser
+        import xml.etree.ElementTree as etree
+
+        return etree, {}
+    return etree, _LXML_ITERPARSE_OPTIONS
+
+
+@lru_cache(maxsize=None)
+def _ijson():
+    """Import ijson on first use, returning None when it is not installed."""
+    try:
+        import ijson
+    except ImportError:  # ijson is optional; large reports are then loaded whole
+        return None
+    return ijson
+
+
+def _element_text(elem) -> str:
+    """Return the stripped text of an XML element, or an empty string."""
+    text = elem.text
+    return text.strip() if text else ""
+
+
+def _release_element(elem) -> None:
+    """Free a processed element (and, with lxml, its preceding siblings)."""
+    elem.clear()
+    if hasattr(elem, "getprevious"):
+        parent = elem.getparent()
+        # Only a testsuite's earlier children are done with: a nested testcase's
+        # siblings are still read by its parent, and a testcase directly under
+        # <testsuites> sits beside the suites whose totals are read afterwards
+        if parent is None or parent.tag != "testsuite":
+            return
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _parse_junit_xml(path: str, columns: Dict[str, List[str]]):
+    """Stream a JUnit report, adding each failure's fields to columns.
+
+    Returns the summed suite totals and the testcase outcome counts, each as
+    (tests, failures, errors, skipped).
+    """
+    test_names = columns["test_name"]
+    class_names = columns["class_name"]
+    messages = columns["message"]
+    types = columns["type"]
+    contents = columns["content"]
+    case_tests = case_failures = case_errors = case_skipped = 0
+
+    # Stream the report so each testcase subtree is freed once processed
+    etree, iterparse_options = _xml_parser()
+    events = etree.iterparse(path, events=("end",), **iterparse_options)
+    for _, elem in events:
+        if elem.tag == "testcase":
+            # One walk over the children finds every outcome element
+            failed = []
+            errored = []
+            was_skipped = False
+            for child in elem:
+                tag = child.tag
+                if tag == "failure":
+                    failed.append(child)
+                elif tag == "error":
+                    errored.append(child)
+                elif tag == "skipped":
+                    was_skipped = True
+            case_tests += 1
+            if failed:
+                case_failures += 1
+            elif errored:
+                case_errors += 1
+            elif was_skipped:
+                case_skipped += 1
+            if failed or errored:
+                test_name = elem.get("name", "unknown")
+                class_name = elem.get("classname", "unknown")
+                failed.extend(errored)
+                for fail in failed:
+                    test_names.append(test_name)
+                    class_names.append(class_name)
+                    messages.append(fail.get("message", ""))
+                    types.append(fail.get("type", ""))
+                    contents.append(_element_text(fail))
+            _release_element(elem)
+
+    # Suite elements are kept (minus their testcases) for the totals
+    root = events.root
+    if root.tag == "testsuites":
+        suites = root.iterfind("./testsuite")
+    else:  # Single testsuite as root
+        suites = (root,)
+    total = failures = errors = skipped = 0
+    for suite in suites:
+        attrib = suite.attrib
+        total += int(attrib.get("tests", 0))
+        failures += int(attrib.get("failures", 0))
+        errors += int(attrib.get("errors", 0))
+        skipped += int(attrib.get("skipped", 0))
+    return (
+        (total, failures, errors, skipped),
+        (case_tests, case_failures, case_errors, case_skipped),
+    )
+
+
+def _count_junit_outcomes(path: str):
+    """Count the results of a JUnit report with expat, building no elements.
+
+    Returns the same totals as _parse_junit_xml without collecting any
+    failure details.
+    """
+    from xml.parsers import expat
+
+    suite_totals = [0, 0, 0, 0]
+    case_totals = [0, 0, 0, 0]
+    root_tag = None
+    depth = 0
+    # [depth, outcome] of each open testcase, innermost last; the outcome is
+    # an index into case_totals, or 0 while the testcase has none
+    open_cases: List[List[int]] = []
+
+    def start(name, attrs):
+        nonlocal root_tag, depth
+        depth += 1
+        if depth == 1:
+            root_tag = name
+        if (depth == 1 and name != "testsuites") or (
+            depth == 2 and name == "testsuite" and root_tag == "testsuites"
+        ):
+            suite_totals[0] += int(attrs.get("tests", 0))
+            suite_totals[1] += int(attrs.get("failures", 0))
+            suite_totals[2] += int(attrs.get("errors", 0))
+            suite_totals[3] += int(attrs.get("skipped", 0))
+        if name == "testcase":
+            open_cases.append([depth, 0])
+        elif open_cases and depth == open_cases[-1][0] + 1:
+            # A failure outranks an error, which outranks a skip
+            rank = _CASE_OUTCOMES.get(name)
+            case = open_cases[-1]
+            if rank and (not case[1] or rank < case[1]):
+                case[1] = rank
+
+    def end(name):
+        nonlocal depth
+        if open_cases and depth == open_cases[-1][0]:
+            outcome = open_cases.pop()[1]
+            case_totals[0] += 1
+            if outcome:
+                case_totals[outcome] += 1
+        depth -= 1
+
+    # With namespace processing, a namespaced element's name carries its
+    # namespace URI, so it matches none of the plain JUnit names, as in
+    # _parse_junit_xml
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    with open(path, "rb") as f:
+        parser.ParseFile(f)
+    return suite_totals, case_totals
+
+
+def _map_file(f):
+    """Memory-map an open binary file for reading.
+
+    Only non-empty regular files can be mapped. Pipes, procfs files and other
+    special files report a size of 0, so they are read into memory instead.
+    """
+    st = os.fstat(f.fileno())
+    if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+        return contextlib.nullcontext(f.read())
+    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        # Logs are scanned front to back, so let the kernel read ahead aggressively
+        data.madvise(mmap.MADV_SEQUENTIAL)
+    return data
+
+
+def _count_newlines(data, start: int, end: int) -> int:
+    """Count line ends in data[start:end] without copying it all at once.
+
+    A line ends at \\n, \\r\\n or a bare \\r, as with universal newlines.
+    """
+    count = 0
+    for offset in range(start, end, _CHUNK_SIZE):
+        stop = min(offset + _CHUNK_SIZE, end)
+        chunk = data[offset:stop]
+        count += chunk.count(b"\n")
+        if b"\r" in chunk:
+            count += chunk.count(b"\r") - chunk.count(b"\r\n")
+            # A \r\n split across two chunks is a single line end
+            if chunk.endswith(b"\r") and data[stop : stop + 1] == b"\n":
+                count -= 1
+    return count
+
+
+def _iter_server_error_lines(data):
+    """Yield the (start, end) offsets of each server log line with an error marker.
+
+    The markers are fixed strings, so each window of the buffer is lowercased
+    once and searched with bytes.find, which is much faster than running a
+    case-insensitive regex alternation over the whole log.
+    """
+    size = len(data)
+    find = data.find
+    rfind = data.rfind
+    pos = 0
+    while pos < size:
+        base = pos
+        window = data[base : base + _CHUNK_SIZE + _SERVER_ERR_OVERLAP].lower()
+        window_find = window.find
+        pos = base + _CHUNK_SIZE
+        # Next occurrence of each marker in the window, refreshed once passed
+        hits = {marker: window_find(marker) for marker in _SERVER_ERR_MARKERS}
+        while True:
+            found = [hit for hit in hits.values() if hit != -1]
+            if not found:
+                break
+            hit = base + min(found)
+            # Lines also end at a bare \r; each \r search stays within the line
+            # bounded by \n, so logs without \r are not rescanned
+            start = rfind(b"\n", 0, hit) + 1
+            start = max(start, rfind(b"\r", start, hit) + 1)
+            end = find(b"\n", hit)
+            if end == -1:
+                end = size
+            carriage = find(b"\r", hit, end)
+            if carriage != -1:
+                end = carriage
+            yield start, end
+            # The next line starts after the line end, both bytes of a \r\n
+            after = end + 2 if data[end : end + 2] == b"\r\n" else end + 1
+            pos = max(pos, after)
+            resume = after - base
+            if resume >= len(window):
+                break
+            for marker, marker_hit in hits.items():
+                if marker_hit != -1 and marker_hit < resume:
+                    hits[marker] = window_find(marker, resume)
+
+
+def _stream_security_findings(f, sections: Dict[str, Any]):
+    """Yield each vulnerability while streaming a JSON security report.
+
+    Only the top-level scalar fields in _FINDING_FIELDS are kept for each
+    vulnerability; nested data such as advisories is parsed but never built
+    into Python objects. metadata.vulnerabilities is stored in sections under
+    "metadata", and sections["findings"] records the vulnerabilities layout.
+    """
+    ijson = _ijson()
+    target = None
+    builder = None
+    finding: Optional[Dict[str, Any]] = None
+    key = None
+    layout = None
+    value_next = False
+    depth = 0
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if target is None:
+            if prefix == "metadata.vulnerabilities":
+                target = "metadata"
+                builder = ijson.ObjectBuilder()
+            elif prefix == "vulnerabilities":
+                if event in ("start_map", "start_array"):
+                    layout = "dict" if event == "start_map" else "list"
+                    sections["findings"] = layout
+                elif event == "map_key" and layout == "dict":
+                    # The next event starts this key's vulnerability
+                    value_next = True
+                continue
+            elif value_next or (layout == "list" and prefix == "vulnerabilities.item"):
+                target = "finding"
+                value_next = False
+            else:
+                continue
+            # Findings that are not objects are skipped, as when loaded whole
+            finding = {} if event == "start_map" else None
+
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if builder is not None:
+            builder.event(event, value)
+        elif depth == 1 and finding is not None:
+            if event == "map_key":
+                key = value
+            elif key in _FINDING_FIELDS and event in _SCALAR_EVENTS:
+                finding[key] = value
+        if depth:
+            continue
+
+        if builder is not None:
+            sections["metadata"] = builder.value
+        elif finding is not None:
+            yield finding
+        target = builder = finding = key = None
+
+
+def _count_severities(findings) -> Dict[str, int]:
+    """Count vulnerabilities by severity, skipping entries that are not objects."""
+    counts: Dict[str, int] = {}
+    for vuln in findings:
+        if isinstance(vuln, dict):
+            severity = vuln.get("severity", "unknown")
+            counts[severity] = counts.get(severity, 0) + 1
+    return counts
+
 
 class PipelineAnalyzer:
     def __init__(self):
+        # A single instant is used for every timestamp in the results
+        self._now_iso = (
+            datetime.now(timezone.utc)
+            .isoformat(timespec="seconds")
+            .replace("+00:00", "Z")
+        )
         self.results: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._now_iso,
             "status": "unknown",
             "summary": "",
             "test_results": {},
@@ -38,40 +459,29 @@ class PipelineAnalyzer:
         }
         self.has_test_results = False
         self.has_security_results = False
+        # Failure details of the JUnit report, one list per field
+        self.failure_columns: Optional[Dict[str, List[str]]] = {
+            field: [] for field in FAILURE_DETAIL_FIELDS
+        }
 
-    def analyze_junit_xml(self, path: str) -> bool:
-        """Analyze JUnit XML test results and return whether analysis was successful."""
-        if not os.path.exists(path):
-            self.results["errors"].append(f"JUnit XML not found: {path}")
-            return False
+    def analyze_junit_xml(self, path: str, details: bool = True) -> bool:
+        """Analyze JUnit XML test results and return whether analysis was successful.
 
+        Without details, only the totals are counted, in a faster expat pass
+        that collects no failure_details.
+        """
         try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-
-            # Handle both testsuites and testsuite root elements
-            if root.tag == "testsuites":
-                total = sum(
-                    int(suite.attrib.get("tests", 0))
-                    for suite in root.findall("./testsuite")
-                )
-                failures = sum(
-                    int(suite.attrib.get("failures", 0))
-                    for suite in root.findall("./testsuite")
-                )
-                errors = sum(
-                    int(suite.attrib.get("errors", 0))
-                    for suite in root.findall("./testsuite")
-                )
-                skipped = sum(
-                    int(suite.attrib.get("skipped", 0))
-                    for suite in root.findall("./testsuite")
-                )
-            else:  # Single testsuite as root
-                total = int(root.attrib.get("tests", 0))
-                failures = int(root.attrib.get("failures", 0))
-                errors = int(root.attrib.get("errors", 0))
-                skipped = int(root.attrib.get("skipped", 0))
+            columns: Optional[Dict[str, List[str]]] = None
+            if details:
+                columns = {field: [] for field in FAILURE_DETAIL_FIELDS}
+                suite_totals, case_totals = _parse_junit_xml(path, columns)
+            else:
+                suite_totals, case_totals = _count_junit_outcomes(path)
+            total, failures, errors, skipped = suite_totals
+
+            # Fall back to the testcase outcomes when suites carry no totals
+            if total == 0 and case_totals[0]:
+                total, failures, errors, skipped = case_totals
 
             passed = total - failures - errors - skipped
 
@@ -83,19 +493,6 @@ class PipelineAnalyzer:
                 )
                 return False
 
-            failure_details = []
-            for case in root.findall(".//testcase"):
-                for fail in case.findall("failure") + case.findall("error"):
-                    failure_details.append(
-                        {
-                            "test_name": case.get("name", "unknown"),
-                            "class_name": case.get("classname", "unknown"),
-                            "message": fail.get("message", ""),
-                            "type": fail.get("type", ""),
-                            "content": fail.text.strip() if fail.text else "",
-                        }
-                    )
-
             self.results["test_results"] = {
                 "total": total,
                 "passed": passed,
@@ -103,8 +500,9 @@ class PipelineAnalyzer:
                 "errors": errors,
                 "skipped": skipped,
                 "pass_rate": round(passed / total * 100, 2) if total > 0 else 0,
-                "failure_details": failure_details,
             }
+            # failure_details records are built from these columns in finalize()
+            self.failure_columns = columns
 
             # Set overall status based on test results
             if failures > 0 or errors > 0:
@@ -118,9 +516,7 @@ class PipelineAnalyzer:
 
             # Add recommendations based on test results
             if failures > 0 or errors > 0:
-                self.results["recommendations"].append(
-                    "Fix failing tests before merging"
-                )
+                self.results["recommendations"].append(REC_FIX_FAILING)
 
             if skipped > 0:
                 self.results["warnings"].append(f"{skipped} tests skipped")
@@ -129,6 +525,10 @@ class PipelineAnalyzer:
             self.has_test_results = True
             return True
 
+        except FileNotFoundError:
+            self.results["errors"].append(f"JUnit XML not found: {path}")
+            return False
+
         except Exception as e:
             self.results["errors"].append(f"Error parsing JUnit XML: {str(e)}")
             logger.exception("Error parsing JUnit XML")
@@ -136,48 +536,53 @@ class PipelineAnalyzer:
 
     def analyze_security_report(self, path: str) -> bool:
         """Analyze security scan report and return whether analysis was successful."""
-        if not os.path.exists(path):
-            self.results["warnings"].append(f"Security report not found: {path}")
-            return False
-
         try:
-            with open(path, "r") as f:
+            sections: Optional[Dict[str, Any]] = None
+            metadata_counts: Optional[Dict[str, int]] = None
+            finding_counts: Optional[Dict[str, int]] = None
+            with open(path, "rb") as f:
+                if (
+                    os.fstat(f.fileno()).st_size >= STREAM_SECURITY_REPORT_SIZE
+                    and _ijson() is not None
+                ):
+                    # Stream large reports instead of materializing them
+                    sections = {}
+                    try:
+                        finding_counts = _count_severities(
+                            _stream_security_findings(f, sections)
+                        )
+                    except _ijson().JSONError:
+                        with _map_file(f) as content:
+                            return self._analyze_raw_security_report(content)
+                else:
+                    content = f.read()
+
+            if sections is not None:
+                metadata_counts = sections.get("metadata")
+                if "findings" not in sections:
+                    finding_counts = None
+            else:
                 try:
-                    data = json.load(f)
+                    data = _loads(content)
                 except json.JSONDecodeError:
                     # Handle non-JSON security reports
-                    content = f.read()
-                    self.results["security_scan"]["raw_content"] = content[:1000]
-                    if "No vulnerabilities found" in content:
-                        self.results["security_scan"]["vulnerability_counts"] = {}
-                        self.results["security_scan"]["total_vulnerabilities"] = 0
-                        self.has_security_results = True
-                        return True
-                    return False
+                    return self._analyze_raw_security_report(content)
+
+                # Reports whose top level is not an object carry no counts
+                if isinstance(data, dict):
+                    if "metadata" in data and "vulnerabilities" in data["metadata"]:
+                        metadata_counts = data["metadata"]["vulnerabilities"]
+                    findings = data.get("vulnerabilities")
+                    if isinstance(findings, dict):
+                        finding_counts = _count_severities(findings.values())
+                    elif isinstance(findings, list):
+                        finding_counts = _count_severities(findings)
 
             # Extract vulnerability counts from different JSON formats
-            vulns = {}
-            if "metadata" in data and "vulnerabilities" in data["metadata"]:
-                vulns = data["metadata"]["vulnerabilities"]
-            elif "vulnerabilities" in data:
-                if isinstance(data["vulnerabilities"], list):
-                    vulns = dict(
-                        Counter(
-                            [
-                                v.get("severity", "unknown")
-                                for v in data["vulnerabilities"]
-                            ]
-                        )
-                    )
-                elif isinstance(data["vulnerabilities"], dict):
-                    vulns = dict(
-                        Counter(
-                            [
-                                v.get("severity", "unknown")
-                                for v in data["vulnerabilities"].values()
-                            ]
-                        )
-                    )
+            if metadata_counts is not None:
+                vulns = metadata_counts
+            else:
+                vulns = finding_counts or {}
 
             self.results["security_scan"]["vulnerability_counts"] = vulns
             self.results["security_scan"]["total_vulnerabilities"] = (
@@ -204,39 +609,77 @@ class PipelineAnalyzer:
             self.has_security_results = True
             return True
 
+        except FileNotFoundError:
+            self.results["warnings"].append(f"Security report not found: {path}")
+            return False
+
         except Exception as e:
             self.results["errors"].append(f"Error analyzing security report: {str(e)}")
             logger.exception("Error analyzing security report")
             return False
 
-    def analyze_server_log(self, path: str) -> bool:
-        """Analyze server logs for errors and return whether analysis was successful."""
-        if not os.path.exists(path):
-            self.results["warnings"].append(f"Server log not found: {path}")
-            return False
+    def _analyze_raw_security_report(self, content) -> bool:
+        """Analyze the raw bytes of a security report that is not valid JSON."""
+        # Only the excerpt kept in the results is decoded
+        self.results["security_scan"]["raw_content"] = content[:1000].decode(
+            "utf-8", "replace"
+        )
+        if content.find(b"No vulnerabilities found") != -1:
+            self.results["security_scan"]["vulnerability_counts"] = {}
+            self.results["security_scan"]["total_vulnerabilities"] = 0
+            self.has_security_results = True
+            return True
+        return False
 
-        try:
-            errors_found = []
-            pattern = re.compile(
-                r"(Error:|Exception:|Failed to|fatal:|\[ERROR\])", re.IGNORECASE
-            )
+    def analyze_server_log(self, path: str, count_all: bool = False) -> bool:
+        """Analyze server logs for errors and return whether analysis was successful.
 
-            with open(path, "r") as f:
-                for i, line in enumerate(f, 1):
-                    if pattern.search(line):
-                        errors_found.append({"line": i, "content": line.strip()})
+        Scanning stops once more than MAX_SERVER_LOG_ERRORS errors are found,
+        unless count_all is set to report the exact number of error lines.
+        """
+        try:
+            errors_found: List[Dict[str, Any]] = []
+            error_count = 0
+            truncated = False
+
+            with open(path, "rb") as f, _map_file(f) as data:
+                # Only matching lines cross into Python
+                line_no = 1
+                counted = 0
+                for start, end in _iter_server_error_lines(data):
+                    if len(errors_found) == MAX_SERVER_LOG_ERRORS and not count_all:
+                        truncated = True
+                        break
+                    line_no += _count_newlines(data, counted, start)
+                    counted = start
+                    error_count += 1
+                    if len(errors_found) < MAX_SERVER_LOG_ERRORS:
+                        errors_found.append(
+                            {
+                                "line": line_no,
+                                "content": data[start:end]
+                                .decode("utf-8", "replace")
+                                .strip(),
+                            }
+                        )
 
             if errors_found:
-                self.results["warnings"].append(
-                    f"{len(errors_found)} server log errors"
-                )
-                self.results["server_log_errors"] = errors_found[
-                    :10
-                ]  # Limit to first 10 errors
+                if truncated:
+                    self.results["warnings"].append(
+                        f"More than {MAX_SERVER_LOG_ERRORS} server log errors"
+                    )
+                else:
+                    self.results["warnings"].append(f"{error_count} server log errors")
+                # Only the first MAX_SERVER_LOG_ERRORS errors are kept
+                self.results["server_log_errors"] = errors_found
                 self.results["recommendations"].append("Check server logs for errors")
 
             return True
 
+        except FileNotFoundError:
+            self.results["warnings"].append(f"Server log not found: {path}")
+            return False
+
         except Exception as e:
             self.results["errors"].append(f"Error analyzing server log: {str(e)}")
             logger.exception("Error analyzing server log")
@@ -249,38 +692,47 @@ class PipelineAnalyzer:
             return False
 
         try:
+            # Only search for issues whose keywords appear in the log at all
+            expected: List[str] = []
+            if len(content) >= _CI_LOG_MIN_LENGTH:
+                lowered = content.lower()
+                expected.extend(
+                    issue
+                    for issue, anchor in _CI_LOG_ANCHORS.items()
+                    if anchor in lowered
+                )
+                if _CI_DURATION_ANCHOR in content:
+                    expected.append("duration")
+
+            found: Dict[str, "re.Match[str]"] = {}
+            for issue in expected:
+                match = _CI_LOG_PATTERNS[issue].search(content)
+                if match:
+                    found[issue] = match
+
             # Check for common CI issues
-            if re.search(r"timeout.*?(\d+)", content, re.IGNORECASE):
+            if "timeout" in found:
                 self.results["warnings"].append("Possible timeout detected in CI job")
                 self.results["recommendations"].append(
                     "Increase job timeout or optimize tests"
                 )
 
-            if re.search(
-                r"(out of memory|memory limit exceeded)", content, re.IGNORECASE
-            ):
+            if "oom" in found:
                 self.results["warnings"].append("Memory limit exceeded in CI job")
                 self.results["recommendations"].append(
                     "Increase memory allocation for CI job"
                 )
 
             # Extract performance metrics if available
-            duration_match = re.search(r"Duration: (\d+\.\d+) seconds", content)
-            if duration_match:
+            if "duration" in found:
                 self.results["performance_metrics"]["duration"] = float(
-                    duration_match.group(1)
+                    found["duration"].group(1)
                 )
 
             # Check for coverage issues
-            if re.search(
-                r"(No coverage directory found|Coverage directory not found)",
-                content,
-                re.IGNORECASE,
-            ):
-                self.results["warnings"].append("Coverage directory not found")
-                self.results["recommendations"].append(
-                    "Configure code coverage collection in your tests"
-                )
+            if "coverage" in found:
+                self.results["warnings"].append(WARN_COVERAGE_MISSING)
+                self.results["recommendations"].append(REC_COVERAGE_CFG)
 
             return True
 
@@ -296,41 +748,73 @@ class PipelineAnalyzer:
 
     def check_coverage_dir(self, path: str) -> None:
         """Check if coverage directory exists and has content."""
-        if not os.path.exists(path):
-            self.results["warnings"].append("Coverage directory not found")
-            self.results["recommendations"].append(
-                "Configure code coverage collection in your tests"
-            )
-        elif not os.listdir(path):
+        # Opening the directory checks that it exists, and one entry is enough
+        # to tell whether it is empty
+        try:
+            with os.scandir(path) as entries:
+                is_empty = next(entries, None) is None
+        except FileNotFoundError:
+            self.results["warnings"].append(WARN_COVERAGE_MISSING)
+            self.results["recommendations"].append(REC_COVERAGE_CFG)
+            return
+        if is_empty:
             self.results["warnings"].append("Coverage directory is empty")
             self.results["recommendations"].append(
                 "Verify code coverage is properly configured"
             )
 
-    def finalize(self) -> None:
-        """Finalize analysis results and add appropriate recommendations."""
-        # Deduplicate recommendations and warnings
-        self.results["recommendations"] = list(set(self.results["recommendations"]))
-        self.results["warnings"] = list(set(self.results["warnings"]))
+    def merge(self, other: "PipelineAnalyzer") -> None:
+        """Add the results of an analyzer that examined other artifacts."""
+        results = other.results
+        for key in ("errors", "warnings", "recommendations"):
+            self.results[key].extend(results[key])
+        for key in ("test_results", "security_scan", "performance_metrics"):
+            self.results[key].update(results[key])
+        if results["status"] != "unknown":
+            self.results["status"] = results["status"]
+            self.results["summary"] = results["summary"]
+        if "server_log_errors" in results:
+            self.results["server_log_errors"] = results["server_log_errors"]
+        if other.has_test_results:
+            self.has_test_results = True
+            self.failure_columns = other.failure_columns
+        self.has_security_results |= other.has_security_results
+
+    def finalize(self, columnar_details: bool = False) -> None:
+        """Finalize analysis results and add appropriate recommendations.
+
+        With columnar_details, failure_details maps each field to the list of
+        its values instead of holding one record per failure.
+        """
+        if self.has_test_results and self.failure_columns is not None:
+            if columnar_details:
+                details: Any = self.failure_columns
+            else:
+                # Materialize one failure_details record per failure
+                details = [
+                    dict(zip(FAILURE_DETAIL_FIELDS, row))
+                    for row in zip(*self.failure_columns.values())
+                ]
+            self.results["test_results"]["failure_details"] = details
+
+        # Deduplicate recommendations and warnings, keeping their original order
+        self.results["recommendations"] = list(
+            dict.fromkeys(self.results["recommendations"])
+        )
+        self.results["warnings"] = list(dict.fromkeys(self.results["warnings"]))
 
         # Add general recommendations if none exist
         if not self.results["recommendations"]:
             if self.has_test_results:
                 if self.results["status"] == "passed":
-                    self.results["recommendations"].append(
-                        "Consider adding more test coverage"
-                    )
+                    self.results["recommendations"].append(REC_MORE_COVERAGE)
                     if not self.has_security_results:
-                        self.results["recommendations"].append(
-                            "Set up regular security scans"
-                        )
+                        self.results["recommendations"].append(REC_SECURITY_SCANS)
             else:
-                self.results["recommendations"].append(
-                    "Set up automated tests for your project"
-                )
+                self.results["recommendations"].append(REC_AUTOMATED_TESTS)
 
-        # Add timestamp for when analysis was completed
-        self.results["analysis_timestamp"] = datetime.utcnow().isoformat() + "Z"
+        # Add timestamp for the analysis run
+        self.results["analysis_timestamp"] = self._now_iso
 
 
 def parse_args():
@@ -343,16 +827,41 @@ def parse_args():
         "--security-scan-report-path", help="Path to security scan report file"
     )
     parser.add_argument("--server-log-path", help="Path to server log file")
+    parser.add_argument(
+        "--count-server-log-errors",
+        action="store_true",
+        help="Scan the whole server log to report the exact error count",
+    )
     parser.add_argument(
         "--gitlab-ci-log-placeholder", help="GitLab CI log content or placeholder"
     )
     parser.add_argument("--test-duration", help="Test duration in seconds")
     parser.add_argument("--coverage-dir", help="Path to coverage directory")
     parser.add_argument("--output-file", help="Path to output JSON file")
+    parser.add_argument(
+        "--skip-failure-details",
+        action="store_true",
+        help="Only count the JUnit results, without collecting failure details",
+    )
+    parser.add_argument(
+        "--pretty", action="store_true", help="Indent the JSON output for reading"
+    )
+    parser.add_argument(
+        "--columnar-failure-details",
+        action="store_true",
+        help="Report failure details as one list per field instead of per failure",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     return parser.parse_args()
 
 
+def _run_analysis(analysis) -> PipelineAnalyzer:
+    """Run one artifact analysis on a fresh analyzer and return that analyzer."""
+    partial_analyzer = PipelineAnalyzer()
+    analysis(partial_analyzer)
+    return partial_analyzer
+
+
 def main():
     args = parse_args()
     if args.verbose:
@@ -361,17 +870,47 @@ def main():
     analyzer = PipelineAnalyzer()
 
     # Analyze available artifacts
+    analyses = []
     if args.junit_xml_report_path:
-        analyzer.analyze_junit_xml(args.junit_xml_report_path)
+        analyses.append(
+            partial(
+                PipelineAnalyzer.analyze_junit_xml,
+                path=args.junit_xml_report_path,
+                details=not args.skip_failure_details,
+            )
+        )
 
     if args.security_scan_report_path:
-        analyzer.analyze_security_report(args.security_scan_report_path)
+        analyses.append(
+            partial(
+                PipelineAnalyzer.analyze_security_report,
+                path=args.security_scan_report_path,
+            )
+        )
 
     if args.server_log_path:
-        analyzer.analyze_server_log(args.server_log_path)
+        analyses.append(
+            partial(
+                PipelineAnalyzer.analyze_server_log,
+                path=args.server_log_path,
+                count_all=args.count_server_log_errors,
+            )
+        )
 
     if args.gitlab_ci_log_placeholder:
-        analyzer.analyze_ci_log(args.gitlab_ci_log_placeholder)
+        analyses.append(
+            partial(
+                PipelineAnalyzer.analyze_ci_log,
+                content=args.gitlab_ci_log_placeholder,
+            )
+        )
+
+    # The artifacts are independent, so each is analyzed concurrently on its
+    # own analyzer; merging in submission order keeps the output deterministic
+    if analyses:
+        with ThreadPoolExecutor(max_workers=len(analyses)) as pool:
+            for partial_analyzer in pool.map(_run_analysis, analyses):
+                analyzer.merge(partial_analyzer)
 
     if args.test_duration:
         analyzer.add_test_duration(args.test_duration)
@@ -380,16 +919,20 @@ def main():
         analyzer.check_coverage_dir(args.coverage_dir)
 
     # Finalize analysis and generate recommendations
-    analyzer.finalize()
+    analyzer.finalize(columnar_details=args.columnar_failure_details)
     results = analyzer.results
 
     # Output results
     if args.output_file:
-        with open(args.output_file, "w") as f:
-            json.dump(results, f, indent=2)
+        with open(args.output_file, "wb") as f:
+            f.write(_dumps(results, pretty=args.pretty))
         logger.info(f"Results written to {args.output_file}")
     else:
-        print(json.dumps(results, indent=2))
+        # Write the encoded JSON as-is rather than decoding it for print()
+        out = sys.stdout.buffer
+        out.write(_dumps(results, pretty=args.pretty))
+        out.write(b"\n")
+        out.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,674 @@
+"""
+Randomized checks of the analyzer's parsers, checks and output against references.
+Run with: python -m unittest discover -s scripts
+"""
+
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import unittest
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+import duo_troubleshoot_analyzer as analyzer
+
+logging.disable(logging.CRITICAL)
+
+
+class _TempFileTestCase(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+        self.file_count = 0
+
+    def write(self, data: bytes) -> str:
+        self.file_count += 1
+        path = os.path.join(self.tmpdir, f"artifact{self.file_count}")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+
+def _reference_error_lines(data: bytes) -> List[Tuple[int, str]]:
+    """Line number and stripped text of each line containing an error marker.
+
+    Lines end at \\n, \\r\\n or \\r, as when the log is read in text mode.
+    """
+    return [
+        (number, line.decode("utf-8", "replace").strip())
+        for number, line in enumerate(data.splitlines(), 1)
+        if any(marker in line.lower() for marker in analyzer._SERVER_ERR_MARKERS)
+    ]
+
+
+_LOG_TOKENS = [
+    b"Error:",
+    b"EXCEPTION:",
+    b"failed to",
+    b"Fatal:",
+    b"[ERROR]",
+    b"erro",
+    b"r:",
+    b"fail",
+    b"ed to",
+    b"\n",
+    b"\n",
+    b"\r\n",
+    b"\r",
+    b" ",
+    b"x" * 5,
+    b"caf\xc3\xa9",
+    b"\xff",
+]
+
+
+class ServerLogTest(_TempFileTestCase):
+    def random_log(self, rnd: random.Random) -> bytes:
+        return b"".join(rnd.choice(_LOG_TOKENS) for _ in range(rnd.randint(0, 60)))
+
+    def test_error_lines_match_reference_across_window_boundaries(self):
+        rnd = random.Random(1)
+        # Windows smaller than, equal to and larger than the marker overlap
+        for chunk_size in (1, 4, analyzer._SERVER_ERR_OVERLAP, 16, 64):
+            with mock.patch.object(analyzer, "_CHUNK_SIZE", chunk_size):
+                for _ in range(300):
+                    data = self.random_log(rnd)
+                    lines = [
+                        len(data[:start].splitlines()) + 1
+                        for start, _ in analyzer._iter_server_error_lines(data)
+                    ]
+                    expected = [number for number, _ in _reference_error_lines(data)]
+                    self.assertEqual(lines, expected, (chunk_size, data))
+
+    def test_analysis_reports_reference_lines(self):
+        rnd = random.Random(2)
+        with mock.patch.object(analyzer, "_CHUNK_SIZE", 16):
+            for _ in range(300):
+                data = self.random_log(rnd)
+                path = self.write(data)
+                expected = _reference_error_lines(data)
+                for count_all in (False, True):
+                    pipeline = analyzer.PipelineAnalyzer()
+                    self.assertTrue(pipeline.analyze_server_log(path, count_all))
+                    results = pipeline.results
+                    reported = [
+                        (error["line"], error["content"])
+                        for error in results.get("server_log_errors", [])
+                    ]
+                    limit = analyzer.MAX_SERVER_LOG_ERRORS
+                    self.assertEqual(reported, expected[:limit], data)
+                    if not expected:
+                        self.assertEqual(results["warnings"], [])
+                    elif len(expected) > limit and not count_all:
+                        self.assertEqual(
+                            results["warnings"],
+                            [f"More than {limit} server log errors"],
+                        )
+                    else:
+                        self.assertEqual(
+                            results["warnings"], [f"{len(expected)} server log errors"]
+                        )
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "requires named pipes")
+    def test_reads_pipes(self):
+        path = os.path.join(self.tmpdir, "server.fifo")
+        os.mkfifo(path)
+
+        def feed():
+            with open(path, "wb") as f:
+                f.write(b"started\nError: boom\n")
+
+        writer = threading.Thread(target=feed)
+        writer.start()
+        pipeline = analyzer.PipelineAnalyzer()
+        self.assertTrue(pipeline.analyze_server_log(path))
+        writer.join()
+        self.assertEqual(pipeline.results["warnings"], ["1 server log errors"])
+        self.assertEqual(
+            pipeline.results["server_log_errors"],
+            [{"line": 2, "content": "Error: boom"}],
+        )
+
+
+def _reference_counts(report: Any) -> Dict[str, int]:
+    """Vulnerability counts of a parsed security report."""
+    if not isinstance(report, dict):
+        return {}
+    metadata = report.get("metadata")
+    if isinstance(metadata, dict) and "vulnerabilities" in metadata:
+        return metadata["vulnerabilities"]
+    findings = report.get("vulnerabilities")
+    if isinstance(findings, dict):
+        findings = list(findings.values())
+    if not isinstance(findings, list):
+        return {}
+    counts: Dict[str, int] = {}
+    for vuln in findings:
+        if isinstance(vuln, dict):
+            severity = vuln.get("severity", "unknown")
+            counts[severity] = counts.get(severity, 0) + 1
+    return counts
+
+
+class SecurityReportTest(_TempFileTestCase):
+    def random_finding(self, rnd: random.Random) -> Any:
+        if rnd.random() < 0.15:
+            return rnd.choice([1, "text", None, [{"severity": "critical"}], True])
+        finding: Dict[str, Any] = {}
+        for key in rnd.sample(["name", "id", "severity", "via", "range"], 3):
+            if key == "severity":
+                finding[key] = rnd.choice(["low", "high", "critical", "High", None])
+            elif key == "via":
+                finding[key] = [{"severity": "critical", "via": [{"id": 1}]}, "pkg"]
+            else:
+                finding[key] = f"{key}{rnd.randint(0, 9)}"
+        return finding
+
+    def random_report(self, rnd: random.Random) -> Any:
+        if rnd.random() < 0.1:
+            return rnd.choice([[], "x", 3, [{"severity": "high"}], None])
+        report: Dict[str, Any] = {}
+        if rnd.random() < 0.3:
+            report["other"] = {"vulnerabilities": [{"severity": "low"}]}
+        if rnd.random() < 0.3:
+            counts = {"high": rnd.randint(0, 3), "critical": rnd.randint(0, 2)}
+            report["metadata"] = (
+                {"vulnerabilities": counts} if rnd.random() < 0.7 else {"x": 1}
+            )
+        count = rnd.randint(0, 8)
+        layout = rnd.random()
+        if layout < 0.4:
+            # Keys that look like ijson prefixes must not confuse the stream
+            names = ["item", "a.b", "vulnerabilities", "pkg"]
+            report["vulnerabilities"] = {
+                f"{rnd.choice(names)}{i}" if i else "item": self.random_finding(rnd)
+                for i in range(count)
+            }
+        elif layout < 0.8:
+            report["vulnerabilities"] = [self.random_finding(rnd) for _ in range(count)]
+        elif layout < 0.9:
+            report["vulnerabilities"] = rnd.choice(["none", 5, None])
+        if rnd.random() < 0.3:
+            report["trailer"] = [1, {"severity": "critical"}]
+        return report
+
+    def analyze(self, path: str, stream_size: int) -> Dict[str, Any]:
+        with mock.patch.object(analyzer, "STREAM_SECURITY_REPORT_SIZE", stream_size):
+            pipeline = analyzer.PipelineAnalyzer()
+            self.assertTrue(pipeline.analyze_security_report(path))
+        return pipeline.results
+
+    def test_loaded_reports_match_reference(self):
+        rnd = random.Random(3)
+        for _ in range(300):
+            report = self.random_report(rnd)
+            path = self.write(json.dumps(report).encode())
+            results = self.analyze(path, stream_size=1 << 62)
+            self.assertEqual(
+                results["security_scan"]["vulnerability_counts"],
+                _reference_counts(report),
+                report,
+            )
+
+    @unittest.skipIf(analyzer._ijson() is None, "ijson is not installed")
+    def test_streamed_reports_match_loaded_reports(self):
+        rnd = random.Random(4)
+        for _ in range(300):
+            report = self.random_report(rnd)
+            path = self.write(json.dumps(report, indent=rnd.choice([None, 1])).encode())
+            streamed = self.analyze(path, stream_size=0)
+            loaded = self.analyze(path, stream_size=1 << 62)
+            self.assertEqual(streamed, loaded, report)
+            self.assertEqual(
+                streamed["security_scan"]["vulnerability_counts"],
+                _reference_counts(report),
+                report,
+            )
+
+
+def _reference_junit(document: bytes):
+    """Suite totals, testcase outcome counts and failure details of a report."""
+    root = ElementTree.fromstring(document)
+    suites = root.findall("testsuite") if root.tag == "testsuites" else [root]
+    suite_totals = tuple(
+        sum(int(suite.get(key, 0)) for suite in suites)
+        for key in ("tests", "failures", "errors", "skipped")
+    )
+    case_totals = [0, 0, 0, 0]
+    details: List[Tuple[str, ...]] = []
+
+    def visit(elem):
+        # Testcases are reported in document end order, inner ones first
+        for child in elem:
+            visit(child)
+        if elem.tag != "testcase":
+            return
+        failed = [child for child in elem if child.tag == "failure"]
+        errored = [child for child in elem if child.tag == "error"]
+        case_totals[0] += 1
+        if failed:
+            case_totals[1] += 1
+        elif errored:
+            case_totals[2] += 1
+        elif any(child.tag == "skipped" for child in elem):
+            case_totals[3] += 1
+        for fail in failed + errored:
+            details.append(
+                (
+                    elem.get("name", "unknown"),
+                    elem.get("classname", "unknown"),
+                    fail.get("message", ""),
+                    fail.get("type", ""),
+                    (fail.text or "").strip(),
+                )
+            )
+
+    visit(root)
+    return suite_totals, tuple(case_totals), details
+
+
+class _JUnitReports:
+    """Random JUnit reports covering the layouts the parsers must agree on."""
+
+    def random_testcase(self, rnd: random.Random, name: str, depth: int = 0) -> str:
+        children = []
+        for _ in range(rnd.randint(0, 3)):
+            tag = rnd.choice(["failure", "error", "skipped", "system-out", "testcase"])
+            if tag == "testcase":
+                if depth < 2:
+                    children.append(self.random_testcase(rnd, f"{name}n", depth + 1))
+                continue
+            attrs = "" if rnd.random() < 0.3 else f' message="m{name} &amp;" type="T"'
+            text = rnd.choice(
+                [
+                    "",
+                    " trace <!-- note --> more ",
+                    "x",
+                    "   ",
+                    "<![CDATA[ a <b> ]]>&lt;c&gt;",
+                    "caf\u00e9 &#233;",
+                ]
+            )
+            if rnd.random() < 0.1:
+                # A prefixed element is not a JUnit outcome
+                tag = "x:" + tag
+                attrs += ' xmlns:x="urn:y"'
+            children.append(f"<{tag}{attrs}>{text}</{tag}>")
+        return f'<testcase name="{name}" classname="k">{"".join(children)}</testcase>'
+
+    def random_suite(self, rnd: random.Random, name: str, depth: int = 0) -> str:
+        attrs = " ".join(
+            f'{key}="{rnd.randint(0, 5)}"'
+            for key in ("tests", "failures", "errors", "skipped")
+            if rnd.random() < 0.8
+        )
+        # Namespaced elements are not JUnit elements; xmlns="" undoes that
+        attrs += rnd.choice(["", "", "", ' xmlns="urn:x"', ' xmlns=""'])
+        body = [
+            self.random_testcase(rnd, f"{name}_{i}") for i in range(rnd.randint(0, 4))
+        ]
+        if depth < 2 and rnd.random() < 0.3:
+            body.append(self.random_suite(rnd, f"{name}s", depth + 1))
+        return f"<testsuite {attrs}><properties/><!-- c -->{''.join(body)}</testsuite>"
+
+    def random_report(self, rnd: random.Random) -> bytes:
+        if rnd.random() < 0.5:
+            # Testcases may also sit directly under <testsuites>, between suites
+            suites = "".join(
+                (
+                    self.random_testcase(rnd, f"t{i}")
+                    if rnd.random() < 0.3
+                    else self.random_suite(rnd, str(i))
+                )
+                for i in range(rnd.randint(0, 4))
+            )
+            namespace = ' xmlns="urn:x"' if rnd.random() < 0.2 else ""
+            document = f"<testsuites{namespace}>{suites}</testsuites>"
+        else:
+            document = self.random_suite(rnd, "0")
+        if rnd.random() < 0.3:
+            document = '<?xml version="1.0"?>\n<?pi x?>' + document
+        return document.encode()
+
+
+class JUnitTest(_JUnitReports, _TempFileTestCase):
+    def test_detail_and_count_paths_match_reference(self):
+        rnd = random.Random(5)
+        for _ in range(300):
+            document = self.random_report(rnd)
+            path = self.write(document)
+            suite_totals, case_totals, details = _reference_junit(document)
+
+            columns = {field: [] for field in analyzer.FAILURE_DETAIL_FIELDS}
+            parsed = analyzer._parse_junit_xml(path, columns)
+            self.assertEqual(parsed, (suite_totals, case_totals), document)
+            self.assertEqual(list(zip(*columns.values())), details, document)
+
+            counted = analyzer._count_junit_outcomes(path)
+            self.assertEqual(
+                tuple(map(tuple, counted)), (suite_totals, case_totals), document
+            )
+
+    def test_text_nodes_over_ten_megabytes(self):
+        trace = "at frame\n" * (11 << 17)
+        document = (
+            '<testsuite tests="1" failures="1"><testcase name="a" classname="k">'
+            f'<failure message="m">{trace}</failure>'
+            f"<system-out>{trace}</system-out></testcase></testsuite>"
+        ).encode()
+        path = self.write(document)
+        pipeline = analyzer.PipelineAnalyzer()
+        self.assertTrue(pipeline.analyze_junit_xml(path))
+        self.assertEqual(pipeline.failure_columns["content"], [trace.strip()])
+        self.assertTrue(pipeline.analyze_junit_xml(path, details=False))
+
+
+def _reference_ci_log(content: str) -> Tuple[List[str], List[str], Dict[str, Any]]:
+    """Warnings, recommendations and metrics of the four plain CI log searches.
+
+    The searches match ASCII only, like _CI_LOG_PATTERNS, so non-ASCII digits
+    and case variants such as "İ" for "i" do not match.
+    """
+    flags = re.IGNORECASE | re.ASCII
+    warnings = []
+    recommendations = []
+    metrics = {}
+    if re.search(r"timeout.*?(\d+)", content, flags):
+        warnings.append("Possible timeout detected in CI job")
+        recommendations.append("Increase job timeout or optimize tests")
+    if re.search(r"(out of memory|memory limit exceeded)", content, flags):
+        warnings.append("Memory limit exceeded in CI job")
+        recommendations.append("Increase memory allocation for CI job")
+    duration_match = re.search(r"Duration: (\d+\.\d+) seconds", content, re.ASCII)
+    if duration_match:
+        metrics["duration"] = float(duration_match.group(1))
+    if re.search(
+        r"(No coverage directory found|Coverage directory not found)", content, flags
+    ):
+        warnings.append("Coverage directory not found")
+        recommendations.append("Configure code coverage collection in your tests")
+    return warnings, recommendations, metrics
+
+
+_CI_LOG_TOKENS = [
+    "timeout",
+    "TimeOut",
+    "time",
+    "out",
+    " of ",
+    "memory",
+    "out of memory",
+    "MEMORY LIMIT exceeded",
+    "Duration: ",
+    "duration: ",
+    "1.5",
+    "12",
+    ".",
+    " seconds",
+    "No coverage directory found",
+    "coverage directory NOT FOUND",
+    "Coverage",
+    " directory",
+    "\n",
+    " ",
+    "7",
+    "٣",
+    "tİmeout",
+    "K",
+]
+
+
+class CiLogTest(unittest.TestCase):
+    def test_results_match_reference(self):
+        rnd = random.Random(6)
+        for _ in range(2000):
+            content = "".join(
+                rnd.choice(_CI_LOG_TOKENS) for _ in range(rnd.randint(0, 12))
+            )
+            pipeline = analyzer.PipelineAnalyzer()
+            self.assertEqual(pipeline.analyze_ci_log(content), bool(content))
+            results = pipeline.results
+            if not content:
+                self.assertEqual(results["warnings"], ["No CI log content provided"])
+                continue
+            self.assertEqual(
+                (
+                    results["warnings"],
+                    results["recommendations"],
+                    results["performance_metrics"],
+                ),
+                _reference_ci_log(content),
+                content,
+            )
+
+
+class CoverageDirTest(_TempFileTestCase):
+    def reference(self, path: str) -> Tuple[List[str], List[str]]:
+        """Warnings and recommendations of the exists/listdir check."""
+        if not os.path.exists(path):
+            return (
+                ["Coverage directory not found"],
+                ["Configure code coverage collection in your tests"],
+            )
+        if not os.listdir(path):
+            return (
+                ["Coverage directory is empty"],
+                ["Verify code coverage is properly configured"],
+            )
+        return [], []
+
+    def test_matches_reference(self):
+        empty = os.path.join(self.tmpdir, "empty")
+        os.mkdir(empty)
+        full = os.path.join(self.tmpdir, "full")
+        os.mkdir(full)
+        with open(os.path.join(full, ".hidden"), "w"):
+            pass
+        paths = [empty, full, os.path.join(self.tmpdir, "missing")]
+        if hasattr(os, "symlink"):
+            dangling = os.path.join(self.tmpdir, "dangling")
+            os.symlink(os.path.join(self.tmpdir, "gone"), dangling)
+            linked = os.path.join(self.tmpdir, "linked")
+            os.symlink(full, linked)
+            paths += [dangling, linked]
+        for path in paths:
+            pipeline = analyzer.PipelineAnalyzer()
+            pipeline.check_coverage_dir(path)
+            results = pipeline.results
+            self.assertEqual(
+                (results["warnings"], results["recommendations"]),
+                self.reference(path),
+                path,
+            )
+
+    def test_file_is_not_a_directory(self):
+        path = self.write(b"coverage")
+        with self.assertRaises(NotADirectoryError):
+            os.listdir(path)
+        with self.assertRaises(NotADirectoryError):
+            analyzer.PipelineAnalyzer().check_coverage_dir(path)
+
+
+class DumpsTest(unittest.TestCase):
+    def random_value(self, rnd: random.Random, depth: int = 0) -> Any:
+        choice = rnd.random()
+        if depth < 3 and choice < 0.3:
+            return {
+                self.random_text(rnd): self.random_value(rnd, depth + 1)
+                for _ in range(rnd.randint(0, 3))
+            }
+        if depth < 3 and choice < 0.5:
+            return [self.random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]
+        return rnd.choice(
+            [
+                None,
+                True,
+                False,
+                rnd.randint(-(10**6), 10**6),
+                round(rnd.uniform(0, 100), 2),
+                float(rnd.randint(0, 500)),
+                self.random_text(rnd),
+            ]
+        )
+
+    def random_text(self, rnd: random.Random) -> str:
+        chars = ["a", " ", "é", "\U0001f600", "\x00", "\x1f", "\n", '"', "\\", "/"]
+        return "".join(rnd.choice(chars) for _ in range(rnd.randint(0, 5)))
+
+    def test_matches_stdlib_json(self):
+        rnd = random.Random(7)
+        for _ in range(2000):
+            value = self.random_value(rnd)
+            self.assertEqual(
+                analyzer._dumps(value, pretty=True),
+                json.dumps(value, indent=2, ensure_ascii=False).encode(),
+                value,
+            )
+            self.assertEqual(
+                analyzer._dumps(value),
+                json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode(),
+                value,
+            )
+
+
+class MainTest(_JUnitReports, _TempFileTestCase):
+    def run_main(self, *argv: str) -> Dict[str, Any]:
+        """Run main() with the given arguments and return its results."""
+        path = os.path.join(self.tmpdir, "results.json")
+        with mock.patch.object(sys, "argv", ["analyzer", *argv, "--output-file", path]):
+            analyzer.main()
+        with open(path, "rb") as f:
+            results = json.load(f)
+        del results["timestamp"], results["analysis_timestamp"]
+        return results
+
+    def sequential(self, **paths: str) -> Dict[str, Any]:
+        """Results of running every analysis in turn on one analyzer."""
+        pipeline = analyzer.PipelineAnalyzer()
+        if "junit" in paths:
+            pipeline.analyze_junit_xml(paths["junit"])
+        if "security" in paths:
+            pipeline.analyze_security_report(paths["security"])
+        if "server" in paths:
+            pipeline.analyze_server_log(paths["server"])
+        if "ci" in paths:
+            pipeline.analyze_ci_log(paths["ci"])
+        pipeline.add_test_duration("12")
+        if "coverage" in paths:
+            pipeline.check_coverage_dir(paths["coverage"])
+        pipeline.finalize()
+        # Round-trip through JSON, as the output of main() is
+        results = json.loads(json.dumps(pipeline.results))
+        del results["timestamp"], results["analysis_timestamp"]
+        return results
+
+    def test_concurrent_analyses_match_sequential_run(self):
+        missing = os.path.join(self.tmpdir, "missing")
+        variants = {
+            "junit": [
+                self.write(
+                    b'<testsuite tests="3" failures="1" skipped="1">'
+                    b'<testcase name="a"><failure message="m">trace</failure>'
+                    b"</testcase></testsuite>"
+                ),
+                self.write(b'<testsuite tests="2"><testcase name="a"/></testsuite>'),
+                self.write(b"<testsuite"),
+                missing,
+            ],
+            "security": [
+                self.write(b'{"vulnerabilities": [{"severity": "high"}]}'),
+                self.write(b'{"vulnerabilities": []}'),
+                self.write(b"CRITICAL finding"),
+                missing,
+            ],
+            "server": [self.write(b"ok\nError: boom\r\nfatal: x\n"), missing],
+            "ci": ["timeout after 5 s\nDuration: 1.5 seconds", "all good"],
+            "coverage": [self.tmpdir, missing],
+        }
+        flags = {
+            "junit": "--junit-xml-report-path",
+            "security": "--security-scan-report-path",
+            "server": "--server-log-path",
+            "ci": "--gitlab-ci-log-placeholder",
+            "coverage": "--coverage-dir",
+        }
+        options = [[None, *variants[kind]] for kind in flags]
+        for combination in itertools.product(*options):
+            paths = {
+                kind: value
+                for kind, value in zip(flags, combination)
+                if value is not None
+            }
+            argv = ["--test-duration", "12"]
+            for kind, value in paths.items():
+                argv += [flags[kind], value]
+            self.assertEqual(self.run_main(*argv), self.sequential(**paths), paths)
+
+    def test_failure_detail_layouts_match(self):
+        rnd = random.Random(8)
+        for _ in range(100):
+            path = self.write(self.random_report(rnd))
+            results = self.run_main("--junit-xml-report-path", path)
+            skipped = self.run_main(
+                "--junit-xml-report-path", path, "--skip-failure-details"
+            )
+            columnar = self.run_main(
+                "--junit-xml-report-path", path, "--columnar-failure-details"
+            )
+            records = results["test_results"].pop("failure_details", None)
+            columns = columnar["test_results"].pop("failure_details", None)
+            self.assertEqual(skipped, results, path)
+            self.assertEqual(columnar, results, path)
+            if records is None:
+                self.assertIsNone(columns)
+                continue
+            self.assertEqual(
+                columns,
+                {
+                    field: [record[field] for record in records]
+                    for field in analyzer.FAILURE_DETAIL_FIELDS
+                },
+            )
+
+    def test_count_server_log_errors(self):
+        limit = analyzer.MAX_SERVER_LOG_ERRORS
+        path = self.write(b"Error: boom\n" * (limit + 5))
+        capped = self.run_main("--server-log-path", path)
+        counted = self.run_main("--server-log-path", path, "--count-server-log-errors")
+        self.assertEqual(capped["warnings"], [f"More than {limit} server log errors"])
+        self.assertEqual(counted["warnings"], [f"{limit + 5} server log errors"])
+        self.assertEqual(capped["server_log_errors"], counted["server_log_errors"])
+        self.assertEqual(len(counted["server_log_errors"]), limit)
+
+    def test_stdout_matches_output_file(self):
+        path = self.write(b'<testsuite tests="1"><testcase name="a"/></testsuite>')
+        output = os.path.join(self.tmpdir, "results.json")
+        stdout = mock.Mock()
+        stdout.buffer = io.BytesIO()
+        argv = ["analyzer", "--junit-xml-report-path", path]
+        # Both runs get the same timestamp, so their output is comparable
+        now = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        with mock.patch.object(sys, "stdout", stdout), mock.patch.object(
+            analyzer, "datetime", mock.Mock(now=mock.Mock(return_value=now))
+        ):
+            with mock.patch.object(sys, "argv", argv):
+                analyzer.main()
+            with mock.patch.object(sys, "argv", [*argv, "--output-file", output]):
+                analyzer.main()
+        with open(output, "rb") as f:
+            written = f.read()
+        self.assertEqual(stdout.buffer.getvalue(), written + b"\n")
+
+
+if __name__ == "__main__":
+    unittest.main()